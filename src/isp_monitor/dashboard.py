@@ -10,45 +10,133 @@ Features:
 """
 
 import sys
+import html
 import time
 import math
-from datetime import datetime
+from collections import deque
 from typing import List, Tuple
 
 import numpy as np
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame, QSplitter, QProgressBar,
-    QDialog
+    QDialog, QGraphicsItem, QListView
 )
-from PyQt6.QtCore import QTimer, Qt, QThread, pyqtSignal
+from PyQt6.QtCore import QTimer, Qt, QThread, pyqtSignal, QStringListModel
 import pyqtgraph as pg
 from pyqtgraph import AxisItem
 
 from .monitor import ISPMonitor
-from .workers import SpeedTestWorker, DNSLeakTestWorker
+from .workers import PingWorker, SpeedTestWorker, DNSLeakTestWorker
 from .utils import format_time
 
+# Draw plots through OpenGL when PyOpenGL is installed; fall back to the raster painter otherwise
+try:
+    import OpenGL  # noqa: F401
+    pg.setConfigOptions(useOpenGL=True, enableExperimental=True, antialias=False)
+except ImportError:
+    pass
+
+def _downsample_m4(x, y, n_pixels):
+    """
+    Reduce a curve to at most four points per pixel column (first, min, max, last),
+    which draws the same line as the full data.
+    """
+    n = len(y)
+    if n_pixels <= 0 or n <= 4 * n_pixels:
+        return x, y
+    starts = np.linspace(0, n, n_pixels + 1).astype(np.intp)[:-1]
+    lasts = np.append(starts[1:], n) - 1
+    seg = np.repeat(np.arange(n_pixels), lasts - starts + 1)
+    idx = np.arange(n)
+    mins = np.fmin.reduceat(y, starts)
+    maxs = np.fmax.reduceat(y, starts)
+    argmins = np.minimum.reduceat(np.where(y == mins[seg], idx, lasts[seg]), starts)
+    argmaxs = np.minimum.reduceat(np.where(y == maxs[seg], idx, lasts[seg]), starts)
+    picks = np.sort(np.stack((starts, argmins, argmaxs, lasts), axis=1), axis=1).ravel()
+    return x[picks], y[picks]
+
 class TimeAxisItem(AxisItem):
-    """Custom axis for displaying formatted time labels on the ping plot."""
+    """
+    Custom axis for displaying formatted time labels on the ping plot.
+    Tick values map to wall-clock seconds as time_origin + value * scale.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.time_origin = 0.0
+        self.enableAutoSIPrefix(False)
+
     def tickStrings(self, values, scale, spacing):
-        return [format_time(v) for v in values]
+        return [format_time(self.time_origin + v * self.scale) for v in values]
+
+class AppendablePlotCurveItem(pg.PlotCurveItem):
+    """
+    Plot curve that extends its cached path when samples are only appended.
+    appendData clears PlotCurveItem's private render caches (_fillPathList, _mouseShape,
+    _lineSegmentsRendered), so it is tied to pyqtgraph 0.13 and the dependency is pinned below 0.14.
+    The dashboard appends only until the ping window first fills; from then on each sample evicts
+    the oldest one and the curve is rebuilt with setData.
+    """
+    def appendData(self, x, y):
+        """
+        Set new curve data whose leading samples match the data already shown.
+        Only the trailing, not yet plotted samples are turned into path segments;
+        anything else falls back to a full setData.
+        """
+        n_old = 0 if self.xData is None else len(self.xData)
+        if (n_old == 0 or len(x) <= n_old or x[n_old - 1] != self.xData[-1]
+                or self.opts['stepMode'] or self.opts['fillLevel'] is not None):
+            self.setData(x, y)
+            return
+        new_x = x[n_old:]
+        new_y = y[n_old:]
+        if not (np.isfinite(new_x).all() and np.isfinite(new_y).all()):
+            # Gaps need arrayToQPath's connect handling
+            self.setData(x, y)
+            return
+        if self.path is not None:
+            # Extend the existing path from its last point; a path built from the new samples
+            # alone would be a lone moveTo for the usual single-sample append
+            for xi, yi in zip(new_x.tolist(), new_y.tolist()):
+                self.path.lineTo(xi, yi)
+        self.xData = x.view(np.ndarray)
+        self.yData = y.view(np.ndarray)
+        self.fillPath = None
+        self._fillPathList = None
+        self._mouseShape = None
+        self._lineSegmentsRendered = False
+        self.invalidateBounds()
+        self.prepareGeometryChange()
+        self.informViewBoundsChanged()
+        self.update()
+        self.sigPlotChanged.emit(self)
 
 class MonitoringDashboard(QMainWindow):
     """
     Main dashboard window for ISP monitoring.
     Shows real-time ping, packet loss, and speedtest results in a unified UI.
     """
+    # Label templates filled with whole/tenths integer pairs, cheaper than the general float formatter
+    PING_TEMPLATE = "Ping: {}.{} ms"
+    METRICS_TEMPLATE = (
+        "<b>Min:</b> {}.{} ms<br>"
+        "<b>Max:</b> {}.{} ms<br>"
+        "<b>Avg:</b> {}.{} ms<br>"
+        "<b>Loss:</b> {}/{} ({}.{}%)"
+    )
+
     def __init__(self, run_speedtest_at_start=True):
         super().__init__()
+        self._label_texts = {}  # Last text pushed to frequently refreshed labels
         self.monitor = ISPMonitor()
         self.setup_ui()
         self.setup_data_structures()
         self.setup_timers()
+        self.setup_ping_worker()
         self.speedtest_running = False
-        self.speed_label_item = None
         self.speedtest_thread = None
         self.dns_test_thread = None
         self.dns_test_running = False
+        self.dns_tester = None  # Shared across DNS leak test runs with its resolver and answer cache, created on first use
         if run_speedtest_at_start:
             self.run_speed_test_now()
 
@@ -79,13 +167,11 @@ class MonitoringDashboard(QMainWindow):
         
         main_layout.addLayout(status_layout)
 
-        # Show error if speedtest is not available
-        if not self.monitor.speedtest_available:
-            self.speedtest_button.setEnabled(False)
-            self.speed_label.setText("Speed: Speedtest unavailable")
-            self.speed_error_label = QLabel("Speedtest initialization failed. Try again later or check your network.")
-            self.speed_error_label.setStyleSheet("color: red;")
-            main_layout.addWidget(self.speed_error_label)
+        # Speedtest is initialized lazily by the first test; this is shown if that fails
+        self.speed_error_label = QLabel("Speedtest initialization failed. Try again later or check your network.")
+        self.speed_error_label.setStyleSheet("color: red;")
+        self.speed_error_label.hide()
+        main_layout.addWidget(self.speed_error_label)
 
         # DNS leak test results box
         self.dns_result_box = QFrame()
@@ -175,44 +261,172 @@ class MonitoringDashboard(QMainWindow):
     def setup_data_structures(self):
         """Initialize data structures for storing monitoring data and packet loss."""
         self.window_seconds = 300  # 5 minutes for ping
-        self.ping_time_data = []
-        self.ping_data = []
-        self.current_index = 0
-        self.last_speed_value = np.nan
-        self.ping_curve = self.ping_plot.plot(pen='b')
+        self._window_ns = self.window_seconds * 1_000_000_000
+        # Sample times are monotonic nanoseconds counted from local midnight, so axis ticks land on
+        # round wall-clock times while ordering and eviction never see wall-clock steps
+        time_axis = self.ping_plot.getAxis('bottom')
+        time_axis.time_origin = time.mktime(time.localtime()[:3] + (0, 0, 0, 0, 0, -1))
+        time_axis.setScale(1e-9)
+        self._wall_offset_ns = time.time_ns() - time.monotonic_ns()
+        self._mono0_ns = int(time_axis.time_origin) * 1_000_000_000 - self._wall_offset_ns
+        # Ping samples live in preallocated buffers; the live window is [_tail:_head]
+        capacity = 4 * self.window_seconds
+        self._time_buf = np.empty(capacity, dtype=np.int64)
+        # float32 is ample for millisecond pings and halves the bytes pushed through path building
+        self._ping_buf = np.empty(capacity, dtype=np.float32)
+        self._lost_buf = np.zeros(capacity, dtype=np.bool_)
+        self._tail = 0
+        self._head = 0
+        self._m4_key = None
+        self._m4_data = None
+        self._curve_downsampled = False  # whether the curve currently shows M4 points
+        self._dirty = False
+        self._evicted_since_paint = False
+        self._x_right = None  # right edge of the last X range pushed to the plot
+        # Running statistics over the live window; samples are always finite (lost pings are 0.0)
+        self._sum = 0.0
+        self._min_deque = deque()  # (time, value) with increasing values
+        self._max_deque = deque()  # (time, value) with decreasing values
+        # Pens and brushes are built once and shared, rather than parsed from color strings per call
+        self._pen_ping = pg.mkPen('b')
+        self._pen_lost = pg.mkPen('r', width=2)
+        self._brush_lost = pg.mkBrush(255, 0, 0, 100)
+        # Ping buffers are always float arrays, so pyqtgraph's finite check can be skipped
+        self.ping_curve = AppendablePlotCurveItem(pen=self._pen_ping, connect='finite', skipFiniteCheck=True)
+        self.ping_plot.addItem(self.ping_curve)
         # Packet loss tracking
         self.total_pings = 0
         self.lost_pings = 0
-        self.lost_ping_times = []
-        self.lost_ping_scatter = pg.ScatterPlotItem(size=14, pen=pg.mkPen('r', width=2), brush=pg.mkBrush(255,0,0,100), symbol='x')
+        self._scatter_pos = np.empty((capacity, 2), dtype=np.float64)
+        self.lost_ping_scatter = pg.ScatterPlotItem(size=14, pen=self._pen_lost, brush=self._brush_lost, symbol='x')
         self.ping_plot.addItem(self.lost_ping_scatter)
-        self.speed_label_item = None
+        self._scatter_dirty = False
+        self._scatter_y = None
+        # Cache rasterized scatter markers and axes; they repaint only when invalidated
+        self.lost_ping_scatter.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+        for axis in ('bottom', 'left'):
+            self.ping_plot.getAxis(axis).setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
         self.speedtest_running = False
         self.speedtest_thread = None
 
     def setup_timers(self):
         """Set up timers for periodic updates."""
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_data)
-        self.update_timer.start(1000)  # Update every second
+        # Plot redraws are coalesced into at most one per frame (~30 Hz)
+        self.paint_timer = QTimer()
+        self.paint_timer.setSingleShot(True)
+        self.paint_timer.setInterval(33)
+        self.paint_timer.timeout.connect(self.refresh_ping_plot)
+
+    def setup_ping_worker(self):
+        """Start the background thread that produces ping samples."""
+        self.ping_worker = PingWorker(self.monitor)
+        self.ping_worker.ping_ready.connect(self.on_ping_sample)
+        self.ping_worker.connection_checked.connect(self.on_connection_checked)
+        self.ping_worker.start()
+
+    def closeEvent(self, event):
+        """Stop the ping worker before the window goes away."""
+        self.ping_worker.stop()
+        self.ping_worker.wait()
+        super().closeEvent(event)
+
+    def _set_label_text(self, label, text):
+        """Set a label's text, skipping the Qt rich-text update when it is unchanged."""
+        if self._label_texts.get(label) != text:
+            self._label_texts[label] = text
+            label.setText(text)
+
+    def _append_ping_sample(self, timestamp, ping_time, lost):
+        """Append a sample to the ping buffers, compacting them when the end is reached."""
+        if self._head - self._tail == len(self._time_buf):
+            # Window holds more samples than the buffer; make room by dropping the oldest
+            self._evicted_since_paint = True
+            self._evict_ping_samples(self._time_buf[self._tail] + 1)
+        if self._head == len(self._time_buf):
+            count = self._head - self._tail
+            self._time_buf[:count] = self._time_buf[self._tail:self._head]
+            self._ping_buf[:count] = self._ping_buf[self._tail:self._head]
+            self._lost_buf[:count] = self._lost_buf[self._tail:self._head]
+            self._tail = 0
+            self._head = count
+            # Indices restart at 0, so a cached M4 key could match different data
+            self._m4_key = None
+            # Resync the running sum so floating-point drift cannot accumulate
+            self._sum = float(self._ping_buf[:count].sum(dtype=np.float64))
+        self._time_buf[self._head] = timestamp
+        self._ping_buf[self._head] = ping_time
+        self._lost_buf[self._head] = lost
+        # Track the stored (float32) value so eviction subtracts exactly what was added
+        ping_time = float(self._ping_buf[self._head])
+        self._head += 1
+        self._sum += ping_time
+        while self._min_deque and self._min_deque[-1][1] >= ping_time:
+            self._min_deque.pop()
+        self._min_deque.append((timestamp, ping_time))
+        while self._max_deque and self._max_deque[-1][1] <= ping_time:
+            self._max_deque.pop()
+        self._max_deque.append((timestamp, ping_time))
+
+    def _evict_ping_samples(self, cutoff_time):
+        """Drop samples older than cutoff_time from the window; return how many were dropped."""
+        # Common case: the oldest sample is still inside the window
+        if self._head == self._tail or self._time_buf[self._tail] >= cutoff_time:
+            return 0
+        evicted = int(np.searchsorted(self._time_buf[self._tail:self._head], cutoff_time))
+        if evicted:
+            self._sum -= float(self._ping_buf[self._tail:self._tail + evicted].sum(dtype=np.float64))
+            if self._lost_buf[self._tail:self._tail + evicted].any():
+                self._scatter_dirty = True
+            while self._min_deque and self._min_deque[0][0] < cutoff_time:
+                self._min_deque.popleft()
+            while self._max_deque and self._max_deque[0][0] < cutoff_time:
+                self._max_deque.popleft()
+            self._tail += evicted
+        return evicted
+
+    def _reanchor_ping_times(self):
+        """Shift sample times when the wall clock jumped against the monotonic clock (suspend, clock step)."""
+        wall_offset = time.time_ns() - time.monotonic_ns()
+        shift = wall_offset - self._wall_offset_ns
+        if abs(shift) <= 1_000_000_000:
+            return
+        self._wall_offset_ns = wall_offset
+        self._mono0_ns -= shift
+        # Stored samples move with the origin, keeping their spacing and the window's eviction order
+        self._time_buf[self._tail:self._head] += shift
+        self._min_deque = deque((t + shift, v) for t, v in self._min_deque)
+        self._max_deque = deque((t + shift, v) for t, v in self._max_deque)
+        self._evicted_since_paint = True
+        self._scatter_dirty = True
+        self._x_right = None
+        self._m4_key = None
+
+    def _reset_ping_window(self):
+        """Empty the ping window and its running statistics."""
+        self._tail = 0
+        self._head = 0
+        self._sum = 0.0
+        self._min_deque.clear()
+        self._max_deque.clear()
+        self._scatter_dirty = True
+        self._x_right = None
+        self._m4_key = None
+
+    def _ping_curve_data(self, times, pings):
+        """Return the ping window to plot, M4-downsampled to the plot's pixel width when denser."""
+        n_pixels = int(self.ping_plot.getViewBox().width())
+        if len(times) <= 4 * n_pixels:
+            return times, pings
+        key = (self._tail, self._head, n_pixels)
+        if key != self._m4_key:
+            self._m4_data = _downsample_m4(times, pings, n_pixels)
+            self._m4_key = key
+        return self._m4_data
 
     def run_speed_test_now(self):
         """Run a speed test in a background thread and update the UI when done."""
-        if not self.monitor.speedtest_available:
-            try:
-                self.speed_label.setText("Initializing speedtest...")
-                QApplication.processEvents()
-                self.monitor.init_speedtest()
-            except Exception as e:
-                self.speed_label.setText("Speed: Speedtest unavailable")
-                self.speed_error_label.setText(f"Speedtest initialization failed. Try again later or check your network.\n{e}")
-                return
-            if not self.monitor.speedtest_available:
-                self.speed_label.setText("Speed: Speedtest unavailable")
-                self.speed_error_label.setText("Speedtest initialization failed. Try again later or check your network.")
-                return
         if self.speedtest_running:
-            self.speed_label.setText("Speedtest already running")
+            self._set_label_text(self.speed_label, "Speedtest already running")
             self.speedtest_button.setEnabled(False)
             self.speedtest_button.setText("Speedtest currently running")
             return  # Prevent multiple concurrent tests
@@ -221,113 +435,136 @@ class MonitoringDashboard(QMainWindow):
         self.result_box.hide()
         self.speed_progress.show()
         self.speedtest_running = True
-        self.speed_label.setText("Running speed test...")
+        self.ping_worker.paused = True
+        self._set_label_text(self.ping_status_label, "Paused (speed test running)")
+        self._set_label_text(self.speed_label, "Running speed test...")
         self.speedtest_button.setEnabled(False)
         self.speedtest_button.setText("Speedtest currently running")
-        QApplication.processEvents()  # Update UI
         self.speedtest_thread = SpeedTestWorker(self.monitor, force=True)
-        self.speedtest_thread.progress.connect(self.handle_speedtest_progress)
+        self.speedtest_thread.init_status.connect(self.handle_speedtest_init_status)
+        # The progress bar is indeterminate, so per-chunk progress isn't routed back to the GUI thread
         self.speedtest_thread.result_ready.connect(self.handle_speedtest_result)
         self.speedtest_thread.finished.connect(self.cleanup_speedtest_thread)
         self.speedtest_thread.start()
-        self._speedtest_progress = 0
 
-    def handle_speedtest_progress(self, phase, elapsed_time, speed_mbps):
-        # No progress bar logic needed; indeterminate bar is already shown
-        pass
+    def handle_speedtest_init_status(self, status):
+        """Show speedtest initialization progress reported by the worker."""
+        self._set_label_text(self.speed_label, status)
 
     def handle_speedtest_result(self, speed):
         """Display speedtest results and hide the progress bar."""
-        dn = speed['download']
-        up = speed['upload']
-        self.speed_label.setText(f"Speed: {dn:.2f} Mbps (manual)")
-        dn_str = f"{dn:.2f}" if dn is not None and not math.isnan(dn) else "--"
-        up_str = f"{up:.2f}" if up is not None and not math.isnan(up) else "--"
-        self.result_label.setText(f"<b>Dn:</b> {dn_str} Mbps<br><b>Up:</b> {up_str} Mbps")
-        self.result_box.show()
+        if speed.get("error") and not self.monitor.speedtest_available:
+            self._set_label_text(self.speed_label, "Speed: Speedtest unavailable")
+            self.speed_error_label.show()
+        else:
+            self.speed_error_label.hide()
+            dn = speed['download']
+            up = speed['upload']
+            self._set_label_text(self.speed_label, f"Speed: {dn:.2f} Mbps (manual)")
+            dn_str = f"{dn:.2f}" if dn is not None and not math.isnan(dn) else "--"
+            up_str = f"{up:.2f}" if up is not None and not math.isnan(up) else "--"
+            self.result_label.setText(f"<b>Dn:</b> {dn_str} Mbps<br><b>Up:</b> {up_str} Mbps")
+            self.result_box.show()
         self.speedtest_running = False
+        self.ping_worker.paused = False
         self.speed_progress.hide()
-        self.speedtest_button.setEnabled(True)
-        self.speedtest_button.setText("Run Speed Test Now")
 
     def cleanup_speedtest_thread(self):
+        """Release the finished worker and only then allow another test to start."""
         self.speedtest_thread = None
+        self.speedtest_button.setEnabled(True)
+        self.speedtest_button.setText("Run Speed Test Now")
 
-    def update_data(self):
-        """Update monitoring data, refresh plots, and update packet loss info."""
-        if self.speedtest_running:
-            self.ping_status_label.setText("Paused (speed test running)")
-            self.speed_progress.show()
-            return
-        else:
-            is_connected = self.monitor.check_connection()
-            if is_connected:
-                self.ping_status_label.setText("Connected: Running")
-            else:
-                self.ping_status_label.setText("Disconnected")
-        is_connected = self.monitor.check_connection()
-        self.status_label.setText(f"Status: {'Connected' if is_connected else 'Disconnected'}")
-        if self.speedtest_running:
-            self.speed_progress.show()
-        else:
-            self.speed_progress.hide()
+    def on_connection_checked(self, is_connected):
+        """Update connection status and clear the ping window when the link is down."""
+        self._set_label_text(self.status_label, f"Status: {'Connected' if is_connected else 'Disconnected'}")
         if is_connected:
-            ping_time = self.monitor.measure_ping()
-            self.total_pings += 1
-            lost = False
-            self.ping_label.setText(f"Ping: {ping_time:.1f} ms")
-            now = time.time()
-            # Add new data point
-            self.ping_time_data.append(now)
-            self.ping_data.append(ping_time)
-            # Track lost pings
-            if ping_time == 0.0 or ping_time is None:
-                self.lost_pings += 1
-                self.lost_ping_times.append(now)
-                lost = True
-            # Remove old data points outside the window
-            cutoff_time = now - self.window_seconds
-            while self.ping_time_data and self.ping_time_data[0] < cutoff_time:
-                self.ping_time_data.pop(0)
-                self.ping_data.pop(0)
-            # Remove old lost ping times
-            while self.lost_ping_times and self.lost_ping_times[0] < cutoff_time:
-                self.lost_ping_times.pop(0)
-            # Update the ping plot
-            if self.ping_time_data:
-                self.ping_curve.setData(self.ping_time_data, self.ping_data)
-                # Update lost ping scatter plot
-                lost_x = self.lost_ping_times
-                lost_y = [max(self.ping_data) * 1.05 if self.ping_data else 100 for _ in lost_x]  # Place X above the plot
-                self.lost_ping_scatter.setData(lost_x, lost_y)
-                # Scroll to show the last 5 minutes
-                right = self.ping_time_data[-1]
-                left = right - self.window_seconds
-                self.ping_plot.setXRange(left, right)
-                # Update metrics box
-                valid_y = [y for y in self.ping_data if not np.isnan(y)]
-                if len(valid_y) > 0:
-                    min_ping = np.nanmin(valid_y)
-                    max_ping = np.nanmax(valid_y)
-                    avg_ping = np.nanmean(valid_y)
-                    loss_percent = (self.lost_pings / self.total_pings * 100) if self.total_pings > 0 else 0
-                    self.ping_metrics_label.setText(
-                        f"<b>Min:</b> {min_ping:.1f} ms<br>"
-                        f"<b>Max:</b> {max_ping:.1f} ms<br>"
-                        f"<b>Avg:</b> {avg_ping:.1f} ms<br>"
-                        f"<b>Loss:</b> {self.lost_pings}/{self.total_pings} ({loss_percent:.1f}%)"
-                    )
-                else:
-                    self.ping_metrics_label.setText("No data")
+            self._set_label_text(self.ping_status_label, "Connected: Running")
         else:
-            self.ping_data = []
-            self.ping_time_data = []
-            self.last_speed_value = np.nan
-            self.ping_label.setText("Ping: -- ms")
-            self.speed_label.setText("Speed: -- Mbps")
+            self._set_label_text(self.ping_status_label, "Disconnected")
+            self._reset_ping_window()
+            self._set_label_text(self.ping_label, "Ping: -- ms")
+            self._set_label_text(self.speed_label, "Speed: -- Mbps")
             self.speed_progress.hide()
             self.result_box.hide()
 
+    def on_ping_sample(self, timestamp_ns, ping_time, ok):
+        """Store a ping sample from the worker and schedule a plot refresh."""
+        self._reanchor_ping_times()
+        now = timestamp_ns - self._mono0_ns
+        self._set_label_text(self.ping_status_label, "Connected: Running")
+        self.total_pings += 1
+        lost = not ok
+        self._set_label_text(self.ping_label, self.PING_TEMPLATE.format(*divmod(int(ping_time * 10 + 0.5), 10)))
+        # Track lost pings
+        if lost:
+            self.lost_pings += 1
+            self._scatter_dirty = True
+        # Add new data point
+        self._append_ping_sample(now, ping_time, lost)
+        # Remove old data points (and their lost markers) outside the window
+        cutoff_time = now - self._window_ns
+        evicted = self._evict_ping_samples(cutoff_time)
+        self._evicted_since_paint = self._evicted_since_paint or evicted > 0
+        self._dirty = True
+        if not self.paint_timer.isActive():
+            self.paint_timer.start()
+
+    def refresh_ping_plot(self):
+        """Push the latest ping window to the plot and metrics box, once per frame at most."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        evicted = self._evicted_since_paint
+        self._evicted_since_paint = False
+        # Update the ping plot
+        if self._head > self._tail:
+            times = self._time_buf[self._tail:self._head]
+            pings = self._ping_buf[self._tail:self._head]
+            curve_x, curve_y = self._ping_curve_data(times, pings)
+            downsampled = curve_x is not times
+            # Raw data only extends the curve when the last push was raw too, not M4 points
+            if evicted or downsampled or self._curve_downsampled:
+                self.ping_curve.setData(curve_x, curve_y)
+            else:
+                self.ping_curve.appendData(curve_x, curve_y)
+            self._curve_downsampled = downsampled
+            # Window statistics come from the running accumulators, not a rescan
+            min_ping = self._min_deque[0][1]
+            max_ping = self._max_deque[0][1]
+            avg_ping = self._sum / len(times)
+            # Update lost ping scatter plot
+            lost_mask = self._lost_buf[self._tail:self._head]
+            lost_y_value = max_ping * 1.05 if max_ping > 0 else 100  # Place X above the plot
+            # Markers only move when a ping is lost or evicted, or the window max shifts
+            if self._scatter_dirty or (lost_y_value != self._scatter_y and lost_mask.any()):
+                lost_x = times[lost_mask]
+                n_lost = len(lost_x)
+                self._scatter_pos[:n_lost, 0] = lost_x
+                self._scatter_pos[:n_lost, 1] = lost_y_value
+                self.lost_ping_scatter.setData(pos=self._scatter_pos[:n_lost])
+                self._scatter_dirty = False
+                self._scatter_y = lost_y_value
+            # Scroll to show the last 5 minutes; sub-second shifts aren't worth a view transform update
+            right = times[-1]
+            if self._x_right is None or right - self._x_right >= 1_000_000_000:
+                self.ping_plot.setXRange(right - self._window_ns, right)
+                self._x_right = right
+            # Update metrics box
+            # Values are rounded to tenths with integer math; loss is a ratio of counts, so it stays exact
+            total = self.total_pings
+            loss_tenths = (self.lost_pings * 2000 + total) // (2 * total) if total > 0 else 0
+            self._set_label_text(
+                self.ping_metrics_label,
+                self.METRICS_TEMPLATE.format(
+                    *divmod(int(min_ping * 10 + 0.5), 10),
+                    *divmod(int(max_ping * 10 + 0.5), 10),
+                    *divmod(int(avg_ping * 10 + 0.5), 10),
+                    self.lost_pings, total,
+                    *divmod(loss_tenths, 10),
+                )
+            )
+
     def run_dns_leak_test(self):
         """Run a DNS leak test in a background thread."""
         if self.dns_test_running:
@@ -339,7 +576,11 @@ class MonitoringDashboard(QMainWindow):
         self.dns_progress.show()
         self.dns_result_box.hide()
         
-        self.dns_test_thread = DNSLeakTestWorker()
+        # Deferred import keeps the DNS stack out of application startup
+        from .dns_leak import DNSCache, DNSLeakTester
+        if self.dns_tester is None:
+            self.dns_tester = DNSLeakTester(cache=DNSCache())
+        self.dns_test_thread = DNSLeakTestWorker(dns_tester=self.dns_tester)
         self.dns_test_thread.progress.connect(self.handle_dns_test_progress)
         self.dns_test_thread.result_ready.connect(self.handle_dns_test_result)
         self.dns_test_thread.finished.connect(self.cleanup_dns_test_thread)
@@ -359,7 +600,7 @@ class MonitoringDashboard(QMainWindow):
         
         result_text = f"Status: <span style='color: {status_color}'>{status_text}</span>"
         
-        self.dns_result_label.setText(result_text)
+        self._set_label_text(self.dns_result_label, result_text)
         
         # Add "More Info" button if not already added
         if not hasattr(self, 'dns_more_info_button'):
@@ -389,6 +630,8 @@ class MonitoringDashboard(QMainWindow):
 
 class DNSDetailsDialog(QDialog):
     """Dialog window for displaying detailed DNS leak test results."""
+    MAX_LABEL_SERVERS = 20  # Longer server lists are shown in a virtualized list view
+
     def __init__(self, results, parent=None):
         super().__init__(parent)
         self.setWindowTitle("DNS Leak Test Details")
@@ -407,16 +650,14 @@ class DNSDetailsDialog(QDialog):
         
         # Configured DNS
         layout.addWidget(QLabel("<b>Configured DNS Servers:</b>"))
-        for server in results["configured_dns"]:
-            layout.addWidget(QLabel(server))
+        layout.addWidget(self._server_list_widget(results["configured_dns"]))
         
         # Unexpected servers (if leaking)
         if is_leaking:
             layout.addWidget(QLabel(""))  # Spacer
             layout.addWidget(QLabel("<b>Unexpected DNS Servers:</b>"))
             layout.addWidget(QLabel("The following servers were detected but not configured:"))
-            for server in results["unexpected_servers"]:
-                layout.addWidget(QLabel(server))
+            layout.addWidget(self._server_list_widget(results["unexpected_servers"]))
         
         # Test details
         layout.addWidget(QLabel(""))  # Spacer
@@ -429,6 +670,17 @@ class DNSDetailsDialog(QDialog):
         close_button.clicked.connect(self.accept)
         layout.addWidget(close_button)
 
+    def _server_list_widget(self, servers):
+        """Build one widget listing all servers instead of a label per server."""
+        servers = list(servers)
+        if len(servers) > self.MAX_LABEL_SERVERS:
+            view = QListView()
+            view.setModel(QStringListModel(servers, view))
+            return view
+        label = QLabel("<br>".join(html.escape(server) for server in servers))
+        label.setTextFormat(Qt.TextFormat.RichText)
+        return label
+
 def run_dashboard(run_speedtest_at_start=True):
     """Run the monitoring dashboard."""
     app = QApplication(sys.argv)
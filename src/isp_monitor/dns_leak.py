@@ -2,18 +2,67 @@
 DNS leak testing module for ISP Uptime Monitoring.
 """
 import socket
-import concurrent.futures
+import time
+import asyncio
+import threading
 import logging
-from typing import List, Dict, Set
+from collections import OrderedDict
+from typing import List, Dict, Optional, Set
+import dns.asyncbackend
+import dns.asyncquery
+import dns.asyncresolver
+import dns.entropy
+import dns.exception
+import dns.inet
+import dns.message
+import dns.rcode
+import dns.rdatatype
 import dns.resolver
 import requests
 
 logger = logging.getLogger(__name__)
 
+class DNSCache:
+    """Thread-safe LRU cache of DNS answers that honors the record TTL."""
+
+    def __init__(self, maxsize: int = 256, max_ttl: float = 300):
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self._entries = OrderedDict()  # (hostname, rdtype) -> (expires_at, values)
+        self._lock = threading.Lock()
+
+    def get(self, hostname: str, rdtype: str) -> Optional[Set[str]]:
+        """Return the cached answer, or None if it is missing or expired."""
+        key = (hostname, rdtype)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return set(values)
+
+    def put(self, hostname: str, rdtype: str, values: Set[str], ttl: float):
+        """Cache an answer for the shorter of its TTL and max_ttl."""
+        key = (hostname, rdtype)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + min(ttl, self.max_ttl), frozenset(values))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
 class DNSLeakTester:
     """Class for performing DNS leak tests."""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[DNSCache] = None):
+        self.cache = cache
+        self._async_resolver = None  # Built on first test and reused by every later one
+        self._sys_dns_cache = None
+        self._sys_dns_ts = 0.0
+        self.sys_dns_ttl = 60  # seconds before the resolver configuration is re-read
         self.dns_servers = set()
         self.test_domains = [
             "www.google.com",
@@ -24,73 +73,140 @@ class DNSLeakTester:
         ]
     
     def get_system_dns(self) -> List[str]:
-        """Get the system's configured DNS servers."""
+        """Get the system's configured DNS servers, re-reading the resolver configuration at most every sys_dns_ttl seconds."""
+        now = time.monotonic()
+        if self._sys_dns_cache is not None and now - self._sys_dns_ts < self.sys_dns_ttl:
+            return list(self._sys_dns_cache)
         try:
             resolver = dns.resolver.Resolver()
-            return [str(server) for server in resolver.nameservers]
+            self._sys_dns_cache = [str(server) for server in resolver.nameservers]
+            self._sys_dns_ts = now
+            return list(self._sys_dns_cache)
         except Exception as e:
             logger.error(f"Error getting system DNS: {e}")
             return []
 
-    def resolve_domain(self, domain: str) -> Set[str]:
+    async def _query_nameserver(self, nameserver: str, port: int, domain: str, rdtypes: List[str],
+                                results: Dict[str, Set[str]], expiration: float) -> Set[str]:
+        """
+        Send one query per record type to a nameserver on a single UDP socket and store answers in results.
+        Returns the record types that got a reply; on timeout, whatever arrived is kept.
+        """
+        destination = (nameserver, port)
+        queries = {}
+        for rdtype in rdtypes:
+            query = dns.message.make_query(domain, rdtype)
+            while query.id in queries:
+                query.id = dns.entropy.random_16()
+            queries[query.id] = (rdtype, query)
+        answered = set()
+        backend = dns.asyncbackend.get_default_backend()
+        async with await backend.make_socket(dns.inet.af_for_address(nameserver), socket.SOCK_DGRAM) as sock:
+            # The queries go out back to back, so they share one round-trip and one socket
+            for _, query in queries.values():
+                await dns.asyncquery.send_udp(sock, query, destination, expiration)
+            while queries:
+                try:
+                    response, _, _ = await dns.asyncquery.receive_udp(sock, destination, expiration, ignore_unexpected=True)
+                except dns.exception.Timeout:
+                    break
+                entry = queries.get(response.id)
+                if entry is None or not entry[1].is_response(response):
+                    continue
+                del queries[response.id]
+                rdtype, _ = entry
+                answered.add(rdtype)
+                if response.rcode() != dns.rcode.NOERROR:
+                    logger.error(f"Error resolving {domain} {rdtype}: {dns.rcode.to_text(response.rcode())}")
+                    continue
+                # The answer may lead with a CNAME chain; keep only records of the requested type
+                rrsets = [rrset for rrset in response.answer if rrset.rdtype == dns.rdatatype.from_text(rdtype)]
+                if not rrsets:
+                    continue
+                values = {str(rdata) for rrset in rrsets for rdata in rrset}
+                results[rdtype] = values
+                if self.cache is not None:
+                    self.cache.put(domain, rdtype, values, min(rrset.ttl for rrset in rrsets))
+        return answered
+
+    async def _query_batch(self, resolver: dns.asyncresolver.Resolver, domain: str, rdtypes: List[str]) -> Dict[str, Set[str]]:
+        """Query the record types together, moving on to the next nameserver for any type left unanswered."""
+        results = {}
+        pending = list(rdtypes)
+        deadline = time.time() + resolver.lifetime
+        for nameserver in resolver.nameservers:
+            now = time.time()
+            if not pending or now >= deadline:
+                break
+            try:
+                answered = await self._query_nameserver(
+                    str(nameserver), resolver.port, domain, pending, results,
+                    min(now + resolver.timeout, deadline)
+                )
+            except Exception as e:
+                logger.error(f"Error querying {nameserver} for {domain}: {e}")
+                continue
+            pending = [rdtype for rdtype in pending if rdtype not in answered]
+        for rdtype in pending:
+            logger.error(f"Error resolving {domain} {rdtype}: no reply from any nameserver")
+        return results
+
+    async def resolve_domain(self, resolver: dns.asyncresolver.Resolver, domain: str) -> Set[str]:
         """Resolve a domain and track which DNS servers were used."""
         servers = set()
-        try:
-            # Try to get the A record
-            answers = dns.resolver.resolve(domain, 'A')
-            for rdata in answers:
-                servers.add(str(rdata))
-            
-            # Also get the authoritative nameservers
-            ns_answers = dns.resolver.resolve(domain, 'NS')
-            for rdata in ns_answers:
-                servers.add(str(rdata))
-        except Exception as e:
-            logger.error(f"Error resolving {domain}: {e}")
-        
+        pending = []
+        for rdtype in ('A', 'NS'):
+            cached = self.cache.get(domain, rdtype) if self.cache is not None else None
+            if cached is None:
+                pending.append(rdtype)
+            else:
+                servers.update(cached)
+        if pending:
+            # Query the A record and the authoritative nameservers together
+            try:
+                for values in (await self._query_batch(resolver, domain, pending)).values():
+                    servers.update(values)
+            except Exception as e:
+                logger.error(f"Error resolving {domain}: {e}")
         return servers
 
     def check_dns_leaks(self, progress_callback=None) -> Dict:
         """
         Perform a DNS leak test by resolving multiple domains and analyzing the DNS servers used.
+        All lookups run concurrently on a private asyncio event loop.
         
         Returns:
             Dict containing:
-            - configured_dns: List of configured DNS servers
-            - detected_servers: List of all DNS servers detected during resolution
+            - configured_dns: Tuple of configured DNS servers
+            - detected_servers: Tuple of all DNS servers detected during resolution
             - is_leaking: Boolean indicating if DNS leaks were detected
             - details: Additional information about the test
         """
-        configured_dns = set(self.get_system_dns())
-        detected_servers = set()
-        
-        # Use a thread pool to resolve domains concurrently
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_domain = {
-                executor.submit(self.resolve_domain, domain): domain 
-                for domain in self.test_domains
-            }
-            
-            completed = 0
-            for future in concurrent.futures.as_completed(future_to_domain):
-                domain = future_to_domain[future]
-                try:
-                    servers = future.result()
-                    detected_servers.update(servers)
-                    completed += 1
-                    if progress_callback:
-                        progress_callback(completed / len(self.test_domains) * 100)
-                except Exception as e:
-                    logger.error(f"Error testing domain {domain}: {e}")
+        return asyncio.run(self._check_dns_leaks(progress_callback))
+
+    async def _check_dns_leaks(self, progress_callback=None) -> Dict:
+        configured_dns = frozenset(self.get_system_dns())
+        all_sets = []
+        if self._async_resolver is None:
+            self._async_resolver = dns.asyncresolver.Resolver()
+        resolver = self._async_resolver
+
+        completed = 0
+        for future in asyncio.as_completed([self.resolve_domain(resolver, domain) for domain in self.test_domains]):
+            all_sets.append(await future)
+            completed += 1
+            if progress_callback:
+                progress_callback(completed / len(self.test_domains) * 100)
 
+        detected_servers = frozenset().union(*all_sets)
         # Check if we're detecting servers outside our configured ones
         unexpected_servers = detected_servers - configured_dns
         is_leaking = len(unexpected_servers) > 0
 
         return {
-            "configured_dns": list(configured_dns),
-            "detected_servers": list(detected_servers),
-            "unexpected_servers": list(unexpected_servers),
+            "configured_dns": tuple(configured_dns),
+            "detected_servers": tuple(detected_servers),
+            "unexpected_servers": tuple(unexpected_servers),
             "is_leaking": is_leaking,
             "details": {
                 "domains_tested": len(self.test_domains),
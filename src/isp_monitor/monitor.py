@@ -2,49 +2,151 @@
 Network monitoring logic for ISP Uptime Monitoring.
 """
 import time
+import socket
+import struct
+import threading
 import ping3
-import speedtest
 import logging
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+PING_HOST = '8.8.8.8'
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+ICMP_PAYLOAD = b'isp_monitor_ping'
+
+def _icmp_checksum(data: bytes) -> int:
+    """RFC 1071 ones' complement checksum of an ICMP message."""
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+def _parse_echo_reply(data: bytes) -> Optional[Tuple[int, int]]:
+    """Return (icmp_type, sequence) from a received ICMP message, or None if it is too short."""
+    if data and data[0] >> 4 == 4:
+        # macOS delivers the IP header too; Linux starts at the ICMP header
+        data = data[(data[0] & 0x0f) * 4:]
+    if len(data) < 8:
+        return None
+    icmp_type, _, _, _, seq = struct.unpack('!BBHHH', data[:8])
+    return icmp_type, seq
+
 class ISPMonitor:
     """Main class for monitoring ISP uptime and performance."""
     def __init__(self, config: Optional[Dict] = None):
         self.config = config or {}
+        # One ICMP socket is reused for every ping instead of ping3 opening a socket per call
+        self._icmp_sock = self._open_icmp_socket()
+        self._icmp_seq = 0
+        self._icmp_lock = threading.Lock()
+        self._last_ok_ts = float('-inf')  # monotonic time of the last answered ping
+        self.recent_ok_window = 1.5  # seconds an answered ping vouches for the connection
+        # Speedtest() fetches the server list over HTTP, so it is built on the first test rather than here;
+        # availability is assumed until that attempt fails
+        self.speedtest = None
+        self.speedtest_available = True
+        self._speedtest_init_error = None
+        self.last_speed_test = 0
+        # Last completed result in Mbps, served while the test interval hasn't elapsed
+        self._last_download_mbps = 0.0
+        self._last_upload_mbps = 0.0
+        self.speed_test_interval = 300  # 5 minutes
+        logger.info("ISP Monitor initialized")
+    def init_speedtest(self):
+        """Create the speedtest client, updating speedtest_available with the outcome."""
         try:
+            # Imported here so speedtest-cli only loads once a speed test is requested
+            import speedtest
             self.speedtest = speedtest.Speedtest()
             self.speedtest_available = True
+            self._speedtest_init_error = None
         except Exception as e:
             logger.error(f"Speedtest initialization failed: {e}")
             self.speedtest = None
             self.speedtest_available = False
-        self.last_speed_test = 0
-        self.speed_test_interval = 300  # 5 minutes
-        logger.info("ISP Monitor initialized")
+            self._speedtest_init_error = e
+    def _ensure_speedtest(self) -> bool:
+        """Create the speedtest client on first use; return whether one exists. Retries go through init_speedtest."""
+        if self.speedtest is None and self._speedtest_init_error is None:
+            self.init_speedtest()
+        return self.speedtest is not None
+    def _open_icmp_socket(self) -> Optional[socket.socket]:
+        """Open an unprivileged ICMP socket, or return None so pings fall back to ping3."""
+        try:
+            return socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        except OSError as e:
+            # PermissionError on Linux when net.ipv4.ping_group_range excludes this user
+            logger.info(f"Unprivileged ICMP socket unavailable, falling back to ping3: {e}")
+            return None
+    def _ping_once(self, host: str = PING_HOST, timeout: float = 1.0) -> Optional[float]:
+        """Send one echo request and return the round-trip time in seconds, or None if it was lost."""
+        if self._icmp_sock is None:
+            result = ping3.ping(host, timeout=timeout)
+            return result if result else None  # ping3 reports some errors as False
+        with self._icmp_lock:
+            self._icmp_seq = (self._icmp_seq + 1) & 0xffff
+            seq = self._icmp_seq
+            # The kernel rewrites the identifier for datagram ICMP sockets, so it is left as 0
+            header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, 0, seq)
+            checksum = _icmp_checksum(header + ICMP_PAYLOAD)
+            packet = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum, 0, seq) + ICMP_PAYLOAD
+            sent = time.perf_counter()
+            deadline = sent + timeout
+            try:
+                self._icmp_sock.sendto(packet, (host, 0))
+            except OSError as e:
+                logger.debug(f"Ping send failed: {e}")
+                return None
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                self._icmp_sock.settimeout(remaining)
+                try:
+                    data, _ = self._icmp_sock.recvfrom(1024)
+                except OSError:
+                    return None
+                received = time.perf_counter()
+                # Skip late replies to earlier pings that already timed out
+                if _parse_echo_reply(data) == (ICMP_ECHO_REPLY, seq):
+                    return received - sent
     def check_connection(self) -> bool:
+        """
+        Report connectivity, skipping the ping when one was answered within recent_ok_window.
+        The dashboard derives connectivity from measure_ping instead; this stays as public API for scripted checks.
+        """
+        if time.monotonic() - self._last_ok_ts < self.recent_ok_window:
+            return True
         try:
-            return ping3.ping('8.8.8.8', timeout=1) is not None
+            if self._ping_once() is None:
+                return False
+            self._last_ok_ts = time.monotonic()
+            return True
         except Exception as e:
             logger.error(f"Error checking connection: {e}")
             return False
-    def measure_ping(self) -> float:
+    def measure_ping(self) -> Tuple[float, bool]:
+        """Ping once and return (ping_ms, ok); a lost ping is (0.0, False), so the reply doubles as a connectivity check."""
         try:
-            ping_time = ping3.ping('8.8.8.8', timeout=1)
+            ping_time = self._ping_once()
             if ping_time is not None:
-                return ping_time * 1000
-            return 0.0
+                self._last_ok_ts = time.monotonic()
+                return ping_time * 1000, True
+            return 0.0, False
         except Exception as e:
             logger.error(f"Error measuring ping: {e}")
-            return 0.0
+            return 0.0, False
     def measure_speed(self, force=False, progress_callback=None) -> Dict[str, float]:
-        if not self.speedtest_available:
+        if not self._ensure_speedtest():
             logger.error("Speedtest is not available.")
             return {"download": 0.0, "upload": 0.0, "error": True}
         current_time = time.time()
         if not force and current_time - self.last_speed_test < self.speed_test_interval:
-            return {"download": self.speedtest.results.download / 1_000_000 if hasattr(self.speedtest, 'results') else 0.0, "upload": self.speedtest.results.upload / 1_000_000 if hasattr(self.speedtest, 'results') else 0.0}
+            return {"download": self._last_download_mbps, "upload": self._last_upload_mbps}
         try:
             logger.info("Starting speed test...")
             self.speedtest.get_best_server()
@@ -69,6 +171,8 @@ class ISPMonitor:
                     upload_progress.append((elapsed, mbps))
             upload_speed = self.speedtest.upload(callback=upload_callback) / 1_000_000
             self.last_speed_test = current_time
+            self._last_download_mbps = download_speed
+            self._last_upload_mbps = upload_speed
             logger.info(f"Speed test completed: {download_speed:.1f} Mbps down, {upload_speed:.1f} Mbps up")
             return {"download": download_speed, "upload": upload_speed}
         except Exception as e:
@@ -2,7 +2,23 @@
 Utility functions for ISP Uptime Monitoring.
 """
 import time
+from functools import lru_cache
+
+_OFFSET_BUCKET = 900  # zones such as America/St_Johns change offset on a quarter hour, not a UTC hour
+
+@lru_cache(maxsize=256)
+def _utc_offset(bucket: int) -> int:
+    """Local UTC offset in seconds for the given 15-minute epoch bucket, so DST changes are still honored."""
+    return time.localtime(bucket * _OFFSET_BUCKET).tm_gmtoff
+
+@lru_cache(maxsize=4096)
+def _format_seconds_of_day(sod: int) -> str:
+    """Format seconds since local midnight as HH:MM:SS."""
+    h, r = divmod(sod, 3600)
+    m, s = divmod(r, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}"
 
 def format_time(ts: float) -> str:
     """Format a timestamp as HH:MM:SS."""
-    return time.strftime('%H:%M:%S', time.localtime(ts)) 
\ No newline at end of file
+    ts = int(ts // 1)
+    return _format_seconds_of_day((ts + _utc_offset(ts // _OFFSET_BUCKET)) % 86400)
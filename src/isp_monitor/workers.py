@@ -1,17 +1,61 @@
 """
 Worker threads for ISP Uptime Monitoring.
 """
+import time
 from PyQt6.QtCore import QThread, pyqtSignal
-from .dns_leak import DNSLeakTester
+
+class PingWorker(QThread):
+    """Worker thread that pings at a fixed interval so the GUI thread never blocks on ICMP."""
+    ping_ready = pyqtSignal('qint64', float, bool)  # monotonic timestamp (ns), ping_ms (0.0 when lost), ok
+    connection_checked = pyqtSignal(bool)
+
+    def __init__(self, monitor, interval_ms=1000, disconnect_after=2):
+        super().__init__()
+        self.monitor = monitor
+        self.interval_ms = interval_ms
+        self.disconnect_after = disconnect_after
+        self.paused = False
+        self._abort = False
+
+    def run(self):
+        """Ping once per interval until stopped, deriving connectivity from the ping replies."""
+        is_connected = None
+        consecutive_lost = 0
+        while not self._abort:
+            started = time.monotonic()
+            if not self.paused:
+                ping_time, ok = self.monitor.measure_ping()
+                consecutive_lost = 0 if ok else consecutive_lost + 1
+                # A single lost ping is recorded as loss; only a run of them marks the link down
+                connected = ok or (is_connected is True and consecutive_lost < self.disconnect_after)
+                if connected:
+                    self.ping_ready.emit(time.monotonic_ns(), ping_time, ok)
+                if connected != is_connected:
+                    is_connected = connected
+                    self.connection_checked.emit(connected)
+            elapsed_ms = int((time.monotonic() - started) * 1000)
+            self.msleep(max(0, self.interval_ms - elapsed_ms))
+
+    def stop(self):
+        """Ask the ping loop to exit after the current interval."""
+        self._abort = True
 
 class SpeedTestWorker(QThread):
     result_ready = pyqtSignal(dict)
     progress = pyqtSignal(str, float, float)  # phase ('download' or 'upload'), elapsed_time, speed_mbps
-    def __init__(self, monitor, force=False):
+    init_status = pyqtSignal(str)
+    def __init__(self, monitor, force=False, init_if_needed=True):
         super().__init__()
         self.monitor = monitor
         self.force = force
+        self.init_if_needed = init_if_needed
     def run(self):
+        # Server discovery can take seconds, so (re)initialize here rather than on the GUI thread
+        if self.init_if_needed and self.monitor.speedtest is None:
+            self.init_status.emit("Initializing speedtest...")
+            self.monitor.init_speedtest()
+            if self.monitor.speedtest is not None:
+                self.init_status.emit("Running speed test...")
         speed = self.monitor.measure_speed(force=self.force, progress_callback=self.emit_progress)
         self.result_ready.emit(speed)
 
@@ -23,9 +67,13 @@ class DNSLeakTestWorker(QThread):
     result_ready = pyqtSignal(dict)
     progress = pyqtSignal(float)  # Progress percentage (0-100)
 
-    def __init__(self):
+    def __init__(self, dns_tester=None):
         super().__init__()
-        self.dns_tester = DNSLeakTester()
+        if dns_tester is None:
+            # Imported here so dnspython and requests only load once a DNS test is requested
+            from .dns_leak import DNSLeakTester
+            dns_tester = DNSLeakTester()
+        self.dns_tester = dns_tester
 
     def run(self):
         """Run the DNS leak test and emit results."""
@@ -0,0 +1,184 @@
+"""
+Tests for the ping plot helpers in the dashboard module.
+"""
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+from isp_monitor import dashboard as dashboard_module
+from isp_monitor.dashboard import AppendablePlotCurveItem, MonitoringDashboard, _downsample_m4
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+class StubMonitor:
+    """Stands in for ISPMonitor so the dashboard opens no sockets."""
+    speedtest_available = False
+
+
+@pytest.fixture
+def dashboard(qapp, monkeypatch):
+    monkeypatch.setattr(dashboard_module, "ISPMonitor", StubMonitor)
+    # Samples are fed by hand, so the ping thread never runs
+    monkeypatch.setattr(dashboard_module.PingWorker, "start", lambda self: None)
+    window = MonitoringDashboard(run_speedtest_at_start=False)
+    yield window
+    window.paint_timer.stop()
+    window.close()
+
+
+def test_append_data_extends_path_one_sample_at_a_time(qapp):
+    x = np.arange(120, dtype=np.int64)
+    y = np.random.default_rng(0).random(120).astype(np.float32)
+    curve = AppendablePlotCurveItem(connect='finite', skipFiniteCheck=True)
+    curve.setData(x[:1], y[:1])
+    curve.getPath()
+    for n in range(2, len(x) + 1):
+        curve.appendData(x[:n], y[:n])
+        assert curve.path.elementCount() == len(curve.xData) == n
+
+
+def test_append_data_matches_full_path(qapp):
+    x = np.arange(50, dtype=np.int64)
+    y = np.random.default_rng(1).random(50).astype(np.float32)
+    curve = AppendablePlotCurveItem(connect='finite', skipFiniteCheck=True)
+    curve.setData(x[:10], y[:10])
+    curve.getPath()
+    for n in range(11, len(x) + 1):
+        curve.appendData(x[:n], y[:n])
+    path = curve.path
+    for i in range(len(x)):
+        element = path.elementAt(i)
+        assert (element.x, element.y) == pytest.approx((float(x[i]), float(y[i])))
+
+
+def test_m4_keeps_short_data_unchanged():
+    x = np.arange(40, dtype=np.int64)
+    y = np.arange(40, dtype=np.float32)
+    out_x, out_y = _downsample_m4(x, y, 10)
+    assert out_x is x and out_y is y
+
+
+@pytest.mark.parametrize("n, n_pixels", [(1000, 10), (1001, 7), (300, 37)])
+def test_m4_keeps_first_min_max_last_per_bin(n, n_pixels):
+    rng = np.random.default_rng(n)
+    x = np.arange(n, dtype=np.int64) * 1_000_000_000
+    y = rng.random(n).astype(np.float32) * 100
+    out_x, out_y = _downsample_m4(x, y, n_pixels)
+    assert len(out_x) == len(out_y) == 4 * n_pixels
+    assert np.all(np.diff(out_x) >= 0)
+    bounds = np.linspace(0, n, n_pixels + 1).astype(np.intp)
+    for i in range(n_pixels):
+        start, stop = bounds[i], bounds[i + 1]
+        bin_x = out_x[4 * i:4 * i + 4]
+        bin_y = out_y[4 * i:4 * i + 4]
+        assert bin_x[0] == x[start] and bin_y[0] == y[start]
+        assert bin_x[-1] == x[stop - 1] and bin_y[-1] == y[stop - 1]
+        assert bin_y.min() == y[start:stop].min()
+        assert bin_y.max() == y[start:stop].max()
+        # Every kept point is a real sample from this bin
+        assert np.all((bin_x >= x[start]) & (bin_x <= x[stop - 1]))
+        assert np.array_equal(y[bin_x // 1_000_000_000], bin_y)
+
+
+def test_ping_window_statistics_match_brute_force(dashboard):
+    rng = np.random.default_rng(2)
+    n = 2000
+    # Mostly 1 s spacing with some bursts and gaps; the buffer compacts after its 1200th slot
+    gaps = rng.choice([1_000_000_000, 250_000_000, 3_000_000_000], size=n, p=[0.8, 0.15, 0.05])
+    times = np.cumsum(gaps)
+    ok = rng.random(n) > 0.1
+    pings = np.where(ok, rng.uniform(5, 80, n), 0.0).astype(np.float32)
+    compactions = 0
+    for i in range(n):
+        head = dashboard._head
+        dashboard.on_ping_sample(dashboard._mono0_ns + int(times[i]), float(pings[i]), bool(ok[i]))
+        compactions += dashboard._head <= head
+        if i % 7 and i != n - 1:
+            continue
+        dashboard.refresh_ping_plot()
+        live = times[:i + 1] >= times[i] - dashboard._window_ns
+        live_pings = pings[:i + 1][live]
+        assert dashboard._head - dashboard._tail == live.sum()
+        assert dashboard._min_deque[0][1] == live_pings.min()
+        assert dashboard._max_deque[0][1] == live_pings.max()
+        assert dashboard._sum / live.sum() == pytest.approx(live_pings.astype(np.float64).mean(), rel=1e-9)
+        lost_times = times[:i + 1][live & ~ok[:i + 1]]
+        scatter_x, scatter_y = dashboard.lost_ping_scatter.getData()
+        assert np.array_equal(scatter_x, lost_times)
+        max_ping = float(live_pings.max())
+        assert np.all(scatter_y == (max_ping * 1.05 if max_ping > 0 else 100))
+    assert compactions > 0
+    assert dashboard.total_pings == n
+    assert dashboard.lost_pings == (~ok).sum()
+
+
+def test_time_axis_maps_samples_to_wall_clock(dashboard):
+    time_axis = dashboard.ping_plot.getAxis('bottom')
+    # Anchored at local midnight, so round tick values are round wall-clock times
+    assert time.localtime(time_axis.time_origin)[3:6] == (0, 0, 0)
+    dashboard.on_ping_sample(time.monotonic_ns(), 10.0, True)
+    sample_wall = time_axis.time_origin + dashboard._time_buf[dashboard._head - 1] * time_axis.scale
+    assert sample_wall == pytest.approx(time.time(), abs=0.5)
+
+
+def test_ping_times_reanchor_after_wall_clock_jump(dashboard):
+    time_axis = dashboard.ping_plot.getAxis('bottom')
+    start = time.monotonic_ns()
+    for i in range(5):
+        dashboard.on_ping_sample(start + i * 1_000_000_000, 10.0 + i, i != 2)
+    dashboard.refresh_ping_plot()
+    before = dashboard._time_buf[dashboard._tail:dashboard._head].copy()
+    # As after a suspend: the wall clock moved an hour further than the monotonic clock
+    dashboard._wall_offset_ns -= 3600 * 1_000_000_000
+    dashboard.on_ping_sample(start + 5 * 1_000_000_000, 20.0, True)
+    dashboard.refresh_ping_plot()
+    after = dashboard._time_buf[dashboard._tail:dashboard._head]
+    # The shift is re-measured from the clocks, so allow for the microseconds between readings
+    assert np.allclose(after[:5], before + 3600 * 1_000_000_000, rtol=0, atol=1_000_000)
+    assert after[5] - after[4] == 1_000_000_000
+    assert time_axis.time_origin + after[-1] * time_axis.scale == pytest.approx(time.time() + 3600 + 5, abs=0.5)
+    assert [t for t, _ in dashboard._max_deque] == [after[5]]
+    assert np.array_equal(dashboard.ping_curve.xData, after)
+    assert np.array_equal(dashboard.lost_ping_scatter.getData()[0], after[2:3])
+
+
+def test_append_data_rebuilds_when_shown_data_differs(qapp):
+    x = np.arange(40, dtype=np.int64)
+    y = np.random.default_rng(3).random(40).astype(np.float32)
+    curve = AppendablePlotCurveItem(connect='finite', skipFiniteCheck=True)
+    # Fewer points than the new data, but not a prefix of it (as with M4 output)
+    curve.setData(x[::4], y[::4])
+    curve.getPath()
+    curve.appendData(x, y)
+    path = curve.getPath()
+    assert [path.elementAt(i).x for i in range(path.elementCount())] == pytest.approx(x.astype(np.float64).tolist())
+
+
+def test_curve_is_rebuilt_when_leaving_m4(dashboard, monkeypatch):
+    view_box = dashboard.ping_plot.getViewBox()
+    monkeypatch.setattr(view_box, "width", lambda: 50)
+    start = time.monotonic_ns()
+    for i in range(250):
+        dashboard.on_ping_sample(start + i * 1_000_000_000, float(i % 17), True)
+    dashboard.refresh_ping_plot()
+    assert len(dashboard.ping_curve.xData) == 200
+    dashboard.ping_curve.getPath()
+    # A wider view shows the raw samples again, with nothing evicted in between
+    monkeypatch.setattr(view_box, "width", lambda: 1000)
+    dashboard.on_ping_sample(start + 250 * 1_000_000_000, 5.0, True)
+    dashboard.refresh_ping_plot()
+    times = dashboard._time_buf[dashboard._tail:dashboard._head]
+    assert np.array_equal(dashboard.ping_curve.xData, times)
+    path = dashboard.ping_curve.getPath()
+    assert path.elementCount() == len(times)
+    assert [path.elementAt(i).x for i in range(len(times))] == pytest.approx(times.astype(np.float64).tolist())
@@ -0,0 +1,167 @@
+"""
+Tests for the DNS leak tester.
+"""
+import asyncio
+import socket
+import threading
+
+import dns.asyncresolver
+import dns.message
+import dns.rdatatype
+import dns.rrset
+import pytest
+
+from isp_monitor import dns_leak
+from isp_monitor.dns_leak import DNSCache, DNSLeakTester
+
+
+class StubNameserver:
+    """UDP nameserver on loopback that answers A with a CNAME chain and NS directly."""
+
+    def __init__(self, address, port=0, drop=()):
+        self.drop = set(drop)
+        self.questions = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((address, port))
+        self.port = self.sock.getsockname()[1]
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(4096)
+            except OSError:
+                return
+            query = dns.message.from_wire(data)
+            question = query.question[0]
+            self.questions.append(question.rdtype)
+            if question.rdtype in self.drop:
+                continue
+            response = dns.message.make_response(query)
+            if question.rdtype == dns.rdatatype.A:
+                response.answer.append(dns.rrset.from_text(question.name, 60, 'IN', 'CNAME', 'edge.example.'))
+                response.answer.append(dns.rrset.from_text('edge.example.', 30, 'IN', 'A', '192.0.2.1', '192.0.2.2'))
+            else:
+                response.answer.append(dns.rrset.from_text(question.name, 100, 'IN', 'NS', 'ns1.example.'))
+            self.sock.sendto(response.to_wire(), addr)
+
+    def close(self):
+        self.sock.close()
+
+
+def make_resolver(nameservers, port):
+    resolver = dns.asyncresolver.Resolver(configure=False)
+    resolver.nameservers = nameservers
+    resolver.port = port
+    resolver.timeout = 0.5
+    resolver.lifetime = 2
+    return resolver
+
+
+def test_resolve_domain_collects_a_and_ns():
+    server = StubNameserver('127.0.0.1')
+    try:
+        resolver = make_resolver(['127.0.0.1'], server.port)
+        servers = asyncio.run(DNSLeakTester().resolve_domain(resolver, 'www.example.com'))
+    finally:
+        server.close()
+    assert servers == {'192.0.2.1', '192.0.2.2', 'ns1.example.'}
+    assert sorted(server.questions) == [dns.rdatatype.A, dns.rdatatype.NS]
+
+
+def test_resolve_domain_keeps_answer_when_other_type_times_out():
+    server = StubNameserver('127.0.0.1', drop={dns.rdatatype.NS})
+    try:
+        resolver = make_resolver(['127.0.0.1'], server.port)
+        servers = asyncio.run(DNSLeakTester().resolve_domain(resolver, 'www.example.com'))
+    finally:
+        server.close()
+    assert servers == {'192.0.2.1', '192.0.2.2'}
+
+
+def test_resolve_domain_falls_back_to_next_nameserver():
+    dead = StubNameserver('127.0.0.1', drop={dns.rdatatype.A, dns.rdatatype.NS})
+    try:
+        live = StubNameserver('127.0.0.2', port=dead.port)
+    except OSError:
+        dead.close()
+        pytest.skip("127.0.0.2 is not bindable on this host")
+    try:
+        resolver = make_resolver(['127.0.0.1', '127.0.0.2'], dead.port)
+        servers = asyncio.run(DNSLeakTester().resolve_domain(resolver, 'www.example.com'))
+    finally:
+        dead.close()
+        live.close()
+    assert servers == {'192.0.2.1', '192.0.2.2', 'ns1.example.'}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(dns_leak.time, 'monotonic', fake)
+    return fake
+
+
+def test_cache_returns_answer_until_ttl_expires(clock):
+    cache = DNSCache()
+    cache.put('example.com', 'A', {'192.0.2.1'}, ttl=30)
+    clock.now += 29.9
+    assert cache.get('example.com', 'A') == {'192.0.2.1'}
+    clock.now += 0.1
+    assert cache.get('example.com', 'A') is None
+    assert ('example.com', 'A') not in cache._entries
+
+
+def test_cache_caps_ttl_at_max_ttl(clock):
+    cache = DNSCache(max_ttl=300)
+    cache.put('example.com', 'NS', {'ns1.example.'}, ttl=86400)
+    clock.now += 299
+    assert cache.get('example.com', 'NS') == {'ns1.example.'}
+    clock.now += 1
+    assert cache.get('example.com', 'NS') is None
+
+
+def test_cache_keys_on_record_type(clock):
+    cache = DNSCache()
+    cache.put('example.com', 'A', {'192.0.2.1'}, ttl=60)
+    assert cache.get('example.com', 'NS') is None
+
+
+def test_cache_evicts_least_recently_used(clock):
+    cache = DNSCache(maxsize=2)
+    cache.put('a.example', 'A', {'192.0.2.1'}, ttl=60)
+    cache.put('b.example', 'A', {'192.0.2.2'}, ttl=60)
+    assert cache.get('a.example', 'A') == {'192.0.2.1'}  # a is now most recently used
+    cache.put('c.example', 'A', {'192.0.2.3'}, ttl=60)
+    assert cache.get('b.example', 'A') is None
+    assert cache.get('a.example', 'A') == {'192.0.2.1'}
+    assert cache.get('c.example', 'A') == {'192.0.2.3'}
+
+
+def test_cache_returns_a_copy(clock):
+    cache = DNSCache()
+    cache.put('example.com', 'A', {'192.0.2.1'}, ttl=60)
+    cache.get('example.com', 'A').add('198.51.100.1')
+    assert cache.get('example.com', 'A') == {'192.0.2.1'}
+
+
+def test_resolve_domain_answers_repeat_lookups_from_cache():
+    server = StubNameserver('127.0.0.1')
+    try:
+        resolver = make_resolver(['127.0.0.1'], server.port)
+        tester = DNSLeakTester(cache=DNSCache())
+        first = asyncio.run(tester.resolve_domain(resolver, 'www.example.com'))
+        second = asyncio.run(tester.resolve_domain(resolver, 'www.example.com'))
+    finally:
+        server.close()
+    assert first == second
+    assert len(server.questions) == 2
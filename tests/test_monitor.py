@@ -0,0 +1,111 @@
+"""
+Tests for the ICMP helpers and connectivity checks in the monitor module.
+"""
+import struct
+
+import pytest
+
+from isp_monitor import monitor as monitor_module
+from isp_monitor.monitor import ICMP_ECHO_REPLY, ICMP_ECHO_REQUEST, ISPMonitor, _icmp_checksum, _parse_echo_reply
+
+
+def echo(icmp_type, seq, checksum=0, ident=0x1234, payload=b'abcd'):
+    return struct.pack('!BBHHH', icmp_type, 0, checksum, ident, seq) + payload
+
+
+def test_checksum_of_known_echo_request():
+    # 0x0800 + 0x1234 + 0x0001 + 0x6162 + 0x6364 = 0xDEFB, complemented
+    assert _icmp_checksum(echo(ICMP_ECHO_REQUEST, 1)) == 0x2104
+
+
+def test_checksum_verifies_to_zero_once_inserted():
+    packet = echo(ICMP_ECHO_REQUEST, 7, payload=b'isp_monitor_ping')
+    checksum = _icmp_checksum(packet)
+    assert _icmp_checksum(echo(ICMP_ECHO_REQUEST, 7, checksum, payload=b'isp_monitor_ping')) == 0
+
+
+def test_checksum_pads_odd_length():
+    assert _icmp_checksum(b'\x08\x00\x00\x00\x00\x00\x00\x01\x61') == _icmp_checksum(
+        b'\x08\x00\x00\x00\x00\x00\x00\x01\x61\x00'
+    )
+
+
+def test_parse_reply_without_ip_header():
+    assert _parse_echo_reply(echo(ICMP_ECHO_REPLY, 42)) == (ICMP_ECHO_REPLY, 42)
+
+
+def test_parse_reply_with_ip_header():
+    # 20-byte IPv4 header (version 4, IHL 5) as delivered on macOS datagram ICMP sockets
+    ip_header = bytes([0x45]) + bytes(19)
+    assert _parse_echo_reply(ip_header + echo(ICMP_ECHO_REPLY, 42)) == (ICMP_ECHO_REPLY, 42)
+
+
+def test_parse_reply_with_ip_options():
+    ip_header = bytes([0x46]) + bytes(23)
+    assert _parse_echo_reply(ip_header + echo(ICMP_ECHO_REPLY, 9)) == (ICMP_ECHO_REPLY, 9)
+
+
+def test_parse_reply_too_short():
+    assert _parse_echo_reply(b'') is None
+    assert _parse_echo_reply(echo(ICMP_ECHO_REPLY, 1)[:7]) is None
+    assert _parse_echo_reply(bytes([0x45]) + bytes(19)) is None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def scripted_monitor(monkeypatch):
+    """ISPMonitor without a socket whose pings answer from a list (seconds, or None when lost)."""
+    monkeypatch.setattr(ISPMonitor, "_open_icmp_socket", lambda self: None)
+    clock = FakeClock()
+    monkeypatch.setattr(monitor_module.time, "monotonic", clock)
+    monitor = ISPMonitor()
+    monitor.replies = []
+    monitor.pings_sent = 0
+
+    def ping_once():
+        monitor.pings_sent += 1
+        return monitor.replies.pop(0)
+
+    monkeypatch.setattr(monitor, "_ping_once", ping_once)
+    return monitor, clock
+
+
+def test_check_connection_pings_without_recent_reply(scripted_monitor):
+    monitor, clock = scripted_monitor
+    monitor.replies = [None, 0.02]
+    assert monitor.check_connection() is False
+    assert monitor.check_connection() is True
+    assert monitor.pings_sent == 2
+
+
+def test_check_connection_trusts_recent_answered_ping(scripted_monitor):
+    monitor, clock = scripted_monitor
+    monitor.replies = [0.02]
+    assert monitor.measure_ping() == (pytest.approx(20.0), True)
+    clock.now += monitor.recent_ok_window / 2
+    assert monitor.check_connection() is True
+    assert monitor.pings_sent == 1
+
+
+def test_check_connection_pings_once_reply_is_stale(scripted_monitor):
+    monitor, clock = scripted_monitor
+    monitor.replies = [0.02, None]
+    assert monitor.check_connection() is True
+    clock.now += monitor.recent_ok_window
+    assert monitor.check_connection() is False
+    assert monitor.pings_sent == 2
+
+
+def test_lost_ping_does_not_refresh_recent_reply(scripted_monitor):
+    monitor, clock = scripted_monitor
+    monitor.replies = [None, None]
+    assert monitor.measure_ping() == (0.0, False)
+    assert monitor.check_connection() is False
+    assert monitor.pings_sent == 2
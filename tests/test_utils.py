@@ -0,0 +1,40 @@
+"""
+Tests for the utility helpers.
+"""
+import os
+import time
+
+import pytest
+
+from isp_monitor import utils
+
+# Zones whose DST changes fall on a quarter or half hour of UTC, plus a whole-hour zone
+ZONES = ["UTC", "America/New_York", "America/St_Johns", "Australia/Lord_Howe"]
+
+
+@pytest.fixture(params=ZONES)
+def timezone(request):
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available on this platform")
+    old = os.environ.get("TZ")
+    os.environ["TZ"] = request.param
+    time.tzset()
+    utils._utc_offset.cache_clear()
+    yield request.param
+    if old is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = old
+    time.tzset()
+    utils._utc_offset.cache_clear()
+
+
+def test_format_time_matches_strftime_over_a_year(timezone):
+    start = time.mktime((2025, 1, 1, 0, 0, 0, 0, 0, -1))
+    for ts in range(int(start), int(start) + 366 * 86400, 60):
+        assert utils.format_time(ts) == time.strftime('%H:%M:%S', time.localtime(ts)), ts
+
+
+def test_format_time_truncates_fractional_seconds(timezone):
+    ts = 1_700_000_000.75
+    assert utils.format_time(ts) == time.strftime('%H:%M:%S', time.localtime(ts))
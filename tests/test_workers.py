@@ -0,0 +1,46 @@
+"""
+Tests for the connectivity rules in the ping worker.
+"""
+from isp_monitor.workers import PingWorker
+
+
+class ScriptedMonitor:
+    """Answers measure_ping from a fixed list of ok flags, then stops the worker."""
+    def __init__(self, results):
+        self.results = list(results)
+        self.worker = None
+
+    def measure_ping(self):
+        ok = self.results.pop(0)
+        if not self.results:
+            self.worker.stop()
+        return (12.5, True) if ok else (0.0, False)
+
+
+def run_worker(results):
+    monitor = ScriptedMonitor(results)
+    worker = PingWorker(monitor, interval_ms=0)
+    monitor.worker = worker
+    events = []
+    worker.ping_ready.connect(lambda ts, ping_time, ok: events.append(('ping', ok)))
+    worker.connection_checked.connect(lambda connected: events.append(('connected', connected)))
+    # Run the loop on this thread so signals are delivered synchronously
+    worker.run()
+    return events
+
+
+def test_first_lost_ping_reports_disconnected():
+    assert run_worker([False]) == [('connected', False)]
+
+
+def test_single_lost_ping_is_recorded_as_loss():
+    assert run_worker([True, False, True]) == [
+        ('ping', True), ('connected', True), ('ping', False), ('ping', True),
+    ]
+
+
+def test_run_of_lost_pings_marks_link_down_until_reply():
+    assert run_worker([True, False, False, False, True]) == [
+        ('ping', True), ('connected', True), ('ping', False), ('connected', False),
+        ('ping', True), ('connected', True),
+    ]